@@ -0,0 +1,224 @@
+import hashlib
+import logging
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models import EmbeddingCacheModel
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+def normalize_text(text: str) -> str:
+    """
+    Normalizes text before embedding so trivially different inputs share a cache entry.
+    """
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+def embedding_cache_key(model: str, dimension: int, text: str) -> str:
+    """
+    Builds the content address of an embedding from the model, dimension and normalized text.
+    """
+    payload = f"{model}\x00{dimension}\x00{normalize_text(text)}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class EmbeddingCache:
+    """
+    Two-level embedding cache: an in-process LRU in front of the embedding_cache table.
+
+    When no session factory is given the cache only keeps entries in memory.
+    """
+
+    def __init__(self, max_size: int, session_factory: Optional[Callable[[], AsyncSession]] = None):
+        self.max_size = max_size
+        self.session_factory = session_factory
+        self._entries: "OrderedDict[str, List[float]]" = OrderedDict()
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.misses = 0
+        self.saved_characters = 0
+        self.miss_seconds = 0.0
+
+    async def get_many(self, model: str, dimension: int, texts: List[str]) -> List[Optional[List[float]]]:
+        """
+        Looks up embeddings for texts, returning None for every text that is not cached.
+        """
+        keys = [embedding_cache_key(model, dimension, text) for text in texts]
+        results: List[Optional[List[float]]] = [self._get_memory(key) for key in keys]
+        self.memory_hits += sum(1 for result in results if result is not None)
+
+        missing = {key for key, result in zip(keys, results) if result is None}
+        if missing and self.session_factory is not None:
+            try:
+                stored = await self._load(missing)
+            except Exception as e:
+                # Fall back to computing the embeddings if the table is unavailable
+                logger.warning(f"Could not read embeddings from cache: {e}")
+                stored = {}
+            self.db_hits += len(stored)
+            for key, embedding in stored.items():
+                self._put_memory(key, embedding)
+            results = [result if result is not None else stored.get(key) for key, result in zip(keys, results)]
+
+        for text, result in zip(texts, results):
+            if result is None:
+                self.misses += 1
+            else:
+                self.saved_characters += len(text)
+        return results
+
+    async def set_many(self, model: str, dimension: int, texts: List[str], embeddings: List[List[float]], seconds: float = 0.0):
+        """
+        Stores freshly computed embeddings in both cache levels.
+
+        `seconds` is the time spent computing them and feeds the savings estimate.
+        """
+        if not texts:
+            return
+        self.miss_seconds += seconds
+        rows = {}
+        for text, embedding in zip(texts, embeddings):
+            key = embedding_cache_key(model, dimension, text)
+            self._put_memory(key, embedding)
+            rows[key] = embedding
+        if self.session_factory is not None:
+            try:
+                await self._store(model, dimension, rows)
+            except Exception as e:
+                # A failed write only costs a future cache miss
+                logger.warning(f"Could not persist embeddings to cache: {e}")
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Returns hit/miss counters and an estimate of the latency saved by the cache.
+        """
+        hits = self.memory_hits + self.db_hits
+        lookups = hits + self.misses
+        avg_miss_seconds = self.miss_seconds / self.misses if self.misses else 0.0
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "memory_hits": self.memory_hits,
+            "db_hits": self.db_hits,
+            "misses": self.misses,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            # Rough OpenAI token estimate, ~4 characters per token
+            "saved_tokens_estimate": self.saved_characters // 4,
+            "saved_seconds_estimate": hits * avg_miss_seconds,
+        }
+
+    def _get_memory(self, key: str) -> Optional[List[float]]:
+        embedding = self._entries.get(key)
+        if embedding is not None:
+            self._entries.move_to_end(key)
+        return embedding
+
+    def _put_memory(self, key: str, embedding: List[float]):
+        self._entries[key] = embedding
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    async def _load(self, keys: set) -> Dict[str, List[float]]:
+        async with self.session_factory() as db:
+            result = await db.execute(
+                select(EmbeddingCacheModel.key, EmbeddingCacheModel.embedding)
+                .where(EmbeddingCacheModel.key.in_(keys))
+            )
+            return {key: [float(value) for value in embedding] for key, embedding in result.all()}
+
+    async def _store(self, model: str, dimension: int, rows: Dict[str, List[float]]):
+        async with self.session_factory() as db:
+            statement = insert(EmbeddingCacheModel).values([
+                {"key": key, "model": model, "dimension": dimension, "embedding": embedding}
+                for key, embedding in rows.items()
+            ]).on_conflict_do_nothing(index_elements=["key"])
+            await db.execute(statement)
+            await db.commit()
+
+class SemanticCache:
+    """
+    In-process cache of results keyed by the embedding of the request that produced them.
+
+    A lookup returns the stored result of the most similar previous request when its
+    cosine similarity reaches the threshold. Entries expire after `ttl_seconds` and
+    the least recently used entry is evicted once `max_size` is reached.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float, threshold: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.threshold = threshold
+        self._entries: "OrderedDict[int, Tuple[np.ndarray, Any, float]]" = OrderedDict()
+        self._next_id = 0
+        self.hits = 0
+        self.misses = 0
+        self.bypasses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, embedding: List[float]) -> Optional[Any]:
+        """
+        Returns the result stored for the most similar request, or None on a miss.
+        """
+        self._expire()
+        if self._entries:
+            ids = list(self._entries)
+            matrix = np.stack([self._entries[entry_id][0] for entry_id in ids])
+            similarities = matrix @ self._normalize(embedding)
+            best = int(np.argmax(similarities))
+            if similarities[best] >= self.threshold:
+                self.hits += 1
+                self._entries.move_to_end(ids[best])
+                return self._entries[ids[best]][1]
+        self.misses += 1
+        return None
+
+    def put(self, embedding: List[float], value: Any):
+        """
+        Stores a result for a request embedding, replacing the results of similar requests.
+        """
+        vector = self._normalize(embedding)
+        for entry_id in [entry_id for entry_id, entry in self._entries.items() if entry[0] @ vector >= self.threshold]:
+            del self._entries[entry_id]
+        self._entries[self._next_id] = (vector, value, time.monotonic() + self.ttl_seconds)
+        self._next_id += 1
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Returns hit/miss counters of the cache.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "bypasses": self.bypasses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def _expire(self):
+        now = time.monotonic()
+        expired = [entry_id for entry_id, (_, _, expires_at) in self._entries.items() if expires_at <= now]
+        for entry_id in expired:
+            del self._entries[entry_id]
+        self.expirations += len(expired)
+
+    @staticmethod
+    def _normalize(embedding: List[float]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
@@ -1,14 +1,20 @@
 import os
+import time
+import asyncio
 import openai
-from typing import List, Dict, Any, Optional
+from typing import AsyncGenerator, List, Dict, Any, Optional, Tuple
 # Update imports for LlamaIndex 0.12
 from llama_index.llms.openai import OpenAI
 from llama_index.embeddings.openai import OpenAIEmbedding
 from llama_index.core.llms import ChatMessage
 from llama_index.program.openai import OpenAIPydanticProgram
+from llama_index.program.openai.utils import parse_partial_json
+from llama_index.llms.openai.utils import resolve_tool_choice, to_openai_tool
 from llama_index.core.prompts import PromptTemplate
 from config import settings
-from ai.schema import Question, Interview, InterviewEvaluation, QuestionList
+from ai.schema import Question, Interview, AnswerEvaluation, InterviewEvaluation, EvaluationSummary, QuestionList
+from ai.cache import EmbeddingCache, SemanticCache, normalize_text
+from database import AsyncSessionLocal
 
 # Configure OpenAI API
 openai.api_key = settings.OPENAI_API_KEY
@@ -21,11 +27,51 @@ def get_llm():
 def get_embedding_model():
     return OpenAIEmbedding(model=settings.EMBEDDING_MODEL, api_key=settings.OPENAI_API_KEY)
 
+# Shared embedding cache (in-process LRU in front of the embedding_cache table)
+embedding_cache = EmbeddingCache(settings.EMBEDDING_CACHE_SIZE, AsyncSessionLocal) if settings.EMBEDDING_CACHE_ENABLED else None
+
+# Shared cache of question generation results keyed by prompt embedding
+generation_cache = SemanticCache(
+    settings.GENERATION_CACHE_SIZE,
+    settings.GENERATION_CACHE_TTL,
+    settings.GENERATION_CACHE_THRESHOLD
+) if settings.GENERATION_CACHE_ENABLED else None
+
 # Function to get text embedding
 async def get_embedding(text: str) -> List[float]:
-    embedding_model = get_embedding_model()
-    embedding = await embedding_model.aget_text_embedding(text)
-    return embedding
+    embeddings = await get_embeddings([text])
+    return embeddings[0]
+
+# Function to get embeddings for several texts in one batched request
+async def get_embeddings(texts: List[str]) -> List[List[float]]:
+    if not texts:
+        return []
+    texts = [normalize_text(text) for text in texts]
+    
+    # Look up previously computed embeddings
+    if embedding_cache is not None:
+        embeddings = await embedding_cache.get_many(settings.EMBEDDING_MODEL, settings.VECTOR_DIMENSION, texts)
+    else:
+        embeddings = [None] * len(texts)
+    
+    # Embed only the texts that are not cached yet
+    missing = list(dict.fromkeys(text for text, embedding in zip(texts, embeddings) if embedding is None))
+    if missing:
+        start = time.perf_counter()
+        embedding_model = get_embedding_model()
+        computed = await embedding_model.aget_text_embedding_batch(missing)
+        if embedding_cache is not None:
+            await embedding_cache.set_many(
+                settings.EMBEDDING_MODEL, settings.VECTOR_DIMENSION, missing, computed,
+                seconds=time.perf_counter() - start
+            )
+        computed_by_text = dict(zip(missing, computed))
+        embeddings = [
+            embedding if embedding is not None else computed_by_text[text]
+            for text, embedding in zip(texts, embeddings)
+        ]
+    
+    return embeddings
 
 # Function to generate questions from a prompt
 async def generate_questions(prompt: str) -> List[Dict[str, Any]]:
@@ -64,15 +110,21 @@ async def generate_questions(prompt: str) -> List[Dict[str, Any]]:
         print(f"Error generating questions: {e}")
         return []
 
+# Format one available question for the interview generation prompt
+def format_question_info(question: Dict[str, Any]) -> str:
+    tags_str = ", ".join(question.get("tags", []))
+    return f"ID: {question.get('id', 'unknown')}\nQuestion: {question.get('text', '')}\nTags: {tags_str}\nDifficulty: {question.get('difficulty_level', '')}\n\n"
+
+# Rough token count of a text, ~4 characters per token for OpenAI models
+def estimate_tokens(text: str) -> int:
+    return len(text) // 4
+
 # Function to generate an interview from a prompt
 async def generate_interview(prompt: str, tag_name: Optional[str] = None, questions: List[Dict[str, Any]] = None) -> Dict[str, Any]:
     # Format information about available questions
     questions_info = ""
     if questions:
-        questions_info = "Available questions:\n"
-        for q in questions:
-            tags_str = ", ".join(q.get("tags", []))
-            questions_info += f"ID: {q.get('id', 'unknown')}\nQuestion: {q.get('text', '')}\nTags: {tags_str}\nDifficulty: {q.get('difficulty_level', '')}\n\n"
+        questions_info = "Available questions:\n" + "".join(format_question_info(q) for q in questions)
     
     tag_filter = f"for tag '{tag_name}'" if tag_name else ""
     
@@ -121,9 +173,8 @@ async def generate_interview(prompt: str, tag_name: Optional[str] = None, questi
             "question_ids": []
         }
 
-# Function to evaluate answers to questions
-async def evaluate_answers(questions: List[Dict[str, Any]], answers: List[Dict[str, Any]]) -> Dict[str, Any]:
-    # Create a mapping of questions and answers
+# Match answers with the questions they answer
+def build_qa_pairs(questions: List[Dict[str, Any]], answers: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     qa_pairs = []
     for answer in answers:
         for question in questions:
@@ -135,6 +186,11 @@ async def evaluate_answers(questions: List[Dict[str, Any]], answers: List[Dict[s
                     "tags": question.get("tags", []),
                     "question_id": str(question.get("id"))
                 })
+    return qa_pairs
+
+# Build the evaluation prompt for questions and answers
+def build_evaluation_prompt(questions: List[Dict[str, Any]], answers: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], str]:
+    qa_pairs = build_qa_pairs(questions, answers)
     
     # Format information about questions and answers
     qa_info = "Questions and answers:\n"
@@ -159,6 +215,26 @@ async def evaluate_answers(questions: List[Dict[str, Any]], answers: List[Dict[s
     {qa_info}
     """
     
+    return qa_pairs, prompt_str
+
+# Evaluation returned when the LLM call fails
+def evaluation_error() -> Dict[str, Any]:
+    return {
+        "feedback": "Could not evaluate answers due to a technical error.",
+        "assessment": "Error processing answers.",
+        "achieved_level": "junior",
+        "score": 0,
+        "answer_evaluations": [],
+        "question_evaluations": {}
+    }
+
+# Function to evaluate answers to questions
+async def evaluate_answers(questions: List[Dict[str, Any]], answers: List[Dict[str, Any]]) -> Dict[str, Any]:
+    if settings.EVALUATION_MODE == "parallel":
+        return await evaluate_answers_parallel(questions, answers)
+    
+    qa_pairs, prompt_str = build_evaluation_prompt(questions, answers)
+    
     # Create a program for evaluating answers
     llm = get_llm()
     prompt_template = PromptTemplate(prompt_str)
@@ -188,11 +264,198 @@ async def evaluate_answers(questions: List[Dict[str, Any]], answers: List[Dict[s
         return eval_data
     except Exception as e:
         print(f"Error evaluating answers: {e}")
-        return {
-            "feedback": "Could not evaluate answers due to a technical error.",
-            "assessment": "Error processing answers.",
-            "achieved_level": "junior",
-            "score": 0,
-            "answer_evaluations": [],
-            "question_evaluations": {}
-        } 
\ No newline at end of file
+        return evaluation_error()
+
+# Function to evaluate answers while streaming per-answer results
+async def stream_evaluate_answers(questions: List[Dict[str, Any]], answers: List[Dict[str, Any]]) -> AsyncGenerator[Dict[str, Any], None]:
+    """
+    Streams the evaluation of answers from a single LLM call.
+    
+    Yields {"type": "answer_evaluation", "question_id", "evaluation"} for each
+    answer as soon as the model has finished it, then {"type": "evaluation",
+    "evaluation"} with the same data evaluate_answers returns.
+    """
+    if settings.EVALUATION_MODE == "parallel":
+        async for event in stream_evaluate_answers_parallel(questions, answers):
+            yield event
+        return
+    
+    qa_pairs, prompt_str = build_evaluation_prompt(questions, answers)
+    
+    llm = get_llm()
+    messages = PromptTemplate(prompt_str).format_messages(llm=llm)
+    tool = to_openai_tool(InterviewEvaluation)
+    
+    question_id_to_eval = {}
+    
+    def completed_evaluation(i: int, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        # Pair the i-th evaluation with its question
+        if i >= len(qa_pairs):
+            return None
+        evaluation = AnswerEvaluation.model_validate(data).model_dump()
+        question_id = qa_pairs[i]["question_id"]
+        question_id_to_eval[question_id] = evaluation
+        return {"type": "answer_evaluation", "question_id": question_id, "evaluation": evaluation}
+    
+    try:
+        stream = await llm.astream_chat(
+            messages,
+            tools=[tool],
+            tool_choice=resolve_tool_choice(tool["function"]["name"])
+        )
+        
+        arguments = ""
+        emitted = 0
+        async for partial in stream:
+            tool_calls = partial.message.additional_kwargs.get("tool_calls") or []
+            if not tool_calls:
+                continue
+            arguments = tool_calls[0].function.arguments or ""
+            try:
+                partial_data = parse_partial_json(arguments)
+            except ValueError:
+                continue
+            
+            # Every evaluation except the last one in the list is complete
+            partial_evaluations = partial_data.get("answer_evaluations") or []
+            while emitted < len(partial_evaluations) - 1:
+                event = completed_evaluation(emitted, partial_evaluations[emitted])
+                emitted += 1
+                if event:
+                    yield event
+        
+        result = InterviewEvaluation.model_validate_json(arguments)
+        eval_data = result.model_dump()
+        for i in range(emitted, len(eval_data["answer_evaluations"])):
+            event = completed_evaluation(i, eval_data["answer_evaluations"][i])
+            if event:
+                yield event
+        
+        eval_data["question_evaluations"] = question_id_to_eval
+    except Exception as e:
+        print(f"Error evaluating answers: {e}")
+        eval_data = evaluation_error()
+    
+    yield {"type": "evaluation", "evaluation": eval_data}
+
+# Function to evaluate a single answer
+async def evaluate_answer(qa: Dict[str, Any]) -> Dict[str, Any]:
+    tags_str = ", ".join(qa.get("tags", []))
+    
+    # Create a prompt template
+    prompt_str = f"""
+    You are an AI expert in evaluating technical interviews.
+    Evaluate the candidate's answer to one interview question and determine:
+    1. Correctness of the answer (correct, partially correct, incorrect)
+    2. Comment on the answer
+    3. Provide a correct and complete answer to the question
+    
+    Question: {qa.get('question')}
+    Difficulty: {qa.get('difficulty_level')}
+    Tags: {tags_str}
+    Answer: {qa.get('answer')}
+    """
+    
+    llm = get_llm()
+    program = OpenAIPydanticProgram.from_defaults(
+        output_cls=AnswerEvaluation,
+        prompt=PromptTemplate(prompt_str),
+        llm=llm,
+        verbose=settings.DEBUG,
+        tool_choice="auto"
+    )
+    
+    result = await program.acall()
+    return result.model_dump()
+
+# Function to summarize per-answer evaluations into an overall evaluation
+async def summarize_evaluations(qa_pairs: List[Dict[str, Any]], question_evaluations: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    # Only the graded results go into the prompt, not the full answers
+    results_info = "Evaluated answers:\n"
+    for qa in qa_pairs:
+        evaluation = question_evaluations.get(qa["question_id"])
+        if evaluation is None:
+            continue
+        tags_str = ", ".join(qa.get("tags", []))
+        results_info += f"Question: {qa.get('question')}\nDifficulty: {qa.get('difficulty_level')}\nTags: {tags_str}\nCorrectness: {evaluation.get('correctness')}\nComment: {evaluation.get('comment')}\n\n"
+    
+    # Create a prompt template
+    prompt_str = f"""
+    You are an AI expert in evaluating technical interviews.
+    Each of the candidate's answers has already been evaluated.
+    Based on these evaluations, provide an overall evaluation of the interview:
+    1. General feedback on the answers
+    2. Detailed assessment
+    3. Achieved level (junior, middle, senior)
+    4. Score from 0 to 100
+    
+    {results_info}
+    """
+    
+    llm = get_llm()
+    program = OpenAIPydanticProgram.from_defaults(
+        output_cls=EvaluationSummary,
+        prompt=PromptTemplate(prompt_str),
+        llm=llm,
+        verbose=settings.DEBUG,
+        tool_choice="auto"
+    )
+    
+    result = await program.acall()
+    return result.model_dump()
+
+# Run per-answer evaluations concurrently, yielding them as they complete
+async def iterate_answer_evaluations(qa_pairs: List[Dict[str, Any]]) -> AsyncGenerator[Tuple[Dict[str, Any], Optional[Dict[str, Any]]], None]:
+    semaphore = asyncio.Semaphore(max(1, settings.EVALUATION_CONCURRENCY))
+    
+    async def bounded_evaluate(qa: Dict[str, Any]) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+        async with semaphore:
+            try:
+                return qa, await evaluate_answer(qa)
+            except Exception as e:
+                print(f"Error evaluating answer to question {qa.get('question_id')}: {e}")
+                return qa, None
+    
+    tasks = [asyncio.create_task(bounded_evaluate(qa)) for qa in qa_pairs]
+    try:
+        for next_completed in asyncio.as_completed(tasks):
+            yield await next_completed
+    finally:
+        for task in tasks:
+            task.cancel()
+
+# Function to evaluate answers with one concurrent call per answer and a final aggregation call
+async def evaluate_answers_parallel(questions: List[Dict[str, Any]], answers: List[Dict[str, Any]]) -> Dict[str, Any]:
+    evaluation = {}
+    async for event in stream_evaluate_answers_parallel(questions, answers):
+        if event["type"] == "evaluation":
+            evaluation = event["evaluation"]
+    return evaluation
+
+# Function to stream per-answer evaluations of the parallel mode
+async def stream_evaluate_answers_parallel(questions: List[Dict[str, Any]], answers: List[Dict[str, Any]]) -> AsyncGenerator[Dict[str, Any], None]:
+    qa_pairs = build_qa_pairs(questions, answers)
+    
+    # Evaluations are keyed by question ID, so a failed call cannot shift the others
+    question_evaluations = {}
+    async for qa, evaluation in iterate_answer_evaluations(qa_pairs):
+        if evaluation is None:
+            continue
+        question_evaluations[qa["question_id"]] = evaluation
+        yield {"type": "answer_evaluation", "question_id": qa["question_id"], "evaluation": evaluation}
+    
+    if qa_pairs and not question_evaluations:
+        yield {"type": "evaluation", "evaluation": evaluation_error()}
+        return
+    
+    try:
+        eval_data = await summarize_evaluations(qa_pairs, question_evaluations)
+    except Exception as e:
+        print(f"Error summarizing evaluations: {e}")
+        eval_data = evaluation_error()
+    
+    eval_data["answer_evaluations"] = [
+        question_evaluations[qa["question_id"]] for qa in qa_pairs if qa["question_id"] in question_evaluations
+    ]
+    eval_data["question_evaluations"] = question_evaluations
+    yield {"type": "evaluation", "evaluation": eval_data}
@@ -28,8 +28,16 @@ class AnswerEvaluation(BaseModel):
 
 class InterviewEvaluation(BaseModel):
     """Pydantic model for overall interview evaluation"""
+    # Listed first so that streamed responses deliver per-answer evaluations before the summary
+    answer_evaluations: List[AnswerEvaluation] = Field(description="Evaluations for each answer")
+    feedback: str = Field(description="General feedback on all answers")
+    assessment: str = Field(description="Detailed assessment of the interview")
+    achieved_level: str = Field(description="Achieved level: junior, middle, or senior")
+    score: int = Field(description="Score from 0 to 100") 
+
+class EvaluationSummary(BaseModel):
+    """Pydantic model for the overall evaluation aggregated from per-answer evaluations"""
     feedback: str = Field(description="General feedback on all answers")
     assessment: str = Field(description="Detailed assessment of the interview")
     achieved_level: str = Field(description="Achieved level: junior, middle, or senior")
     score: int = Field(description="Score from 0 to 100")
-    answer_evaluations: List[AnswerEvaluation] = Field(description="Evaluations for each answer") 
\ No newline at end of file
@@ -13,7 +13,11 @@ logger = logging.getLogger(__name__)
 class Settings(BaseSettings):
     # Database settings
     DATABASE_URL: str = os.getenv("DATABASE_URL", "postgresql://postgres:postgres@db:5432/interviewer")
-    
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "10"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+    DB_POOL_TIMEOUT: int = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+
     # OpenAI API settings
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "")
     
@@ -21,11 +25,43 @@ class Settings(BaseSettings):
     MODEL_NAME: str = os.getenv("MODEL_NAME", "gpt-4o")
     EMBEDDING_MODEL: str = os.getenv("EMBEDDING_MODEL", "text-embedding-3-large")
     
+    # Number of questions retrieved by similarity for interview generation (0 sends every question)
+    INTERVIEW_CANDIDATE_LIMIT: int = int(os.getenv("INTERVIEW_CANDIDATE_LIMIT", "50"))
+    
+    # Answer evaluation: "single" (one call for all answers) or "parallel" (one call per answer)
+    EVALUATION_MODE: str = os.getenv("EVALUATION_MODE", "single")
+    EVALUATION_CONCURRENCY: int = int(os.getenv("EVALUATION_CONCURRENCY", "5"))
+    
+    # Embedding cache settings
+    EMBEDDING_CACHE_ENABLED: bool = os.getenv("EMBEDDING_CACHE_ENABLED", "True").lower() == "true"
+    EMBEDDING_CACHE_SIZE: int = int(os.getenv("EMBEDDING_CACHE_SIZE", "10000"))
+    
+    # Semantic cache of /questions/generate results
+    GENERATION_CACHE_ENABLED: bool = os.getenv("GENERATION_CACHE_ENABLED", "True").lower() == "true"
+    GENERATION_CACHE_SIZE: int = int(os.getenv("GENERATION_CACHE_SIZE", "500"))
+    GENERATION_CACHE_TTL: int = int(os.getenv("GENERATION_CACHE_TTL", "3600"))
+    GENERATION_CACHE_THRESHOLD: float = float(os.getenv("GENERATION_CACHE_THRESHOLD", "0.95"))
+    
+    # Background jobs: run a worker inside the API process (or start `python worker.py`)
+    JOB_WORKER_ENABLED: bool = os.getenv("JOB_WORKER_ENABLED", "True").lower() == "true"
+    JOB_WORKER_CONCURRENCY: int = int(os.getenv("JOB_WORKER_CONCURRENCY", "4"))
+    JOB_POLL_INTERVAL: float = float(os.getenv("JOB_POLL_INTERVAL", "1.0"))
+    JOB_TIMEOUT: int = int(os.getenv("JOB_TIMEOUT", "300"))
+    JOB_MAX_ATTEMPTS: int = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+    
     # Application settings
     APP_NAME: str = os.getenv("APP_NAME", "Interviewer API")
     VECTOR_DIMENSION: int = int(os.getenv("VECTOR_DIMENSION", "3072"))
     DEBUG: bool = os.getenv("DEBUG", "False").lower() == "true"
+
+    # Vector search settings
+    VECTOR_SEARCH_EF_SEARCH: int = int(os.getenv("VECTOR_SEARCH_EF_SEARCH", "100"))
+    VECTOR_SEARCH_ITERATIVE_SCAN: str = os.getenv("VECTOR_SEARCH_ITERATIVE_SCAN", "relaxed_order")
     
+    # Near-duplicate suppression for generated questions: "link", "skip" or "off"
+    QUESTION_DEDUP_MODE: str = os.getenv("QUESTION_DEDUP_MODE", "link")
+    QUESTION_DEDUP_THRESHOLD: float = float(os.getenv("QUESTION_DEDUP_THRESHOLD", "0.92"))
+
     # API settings
     API_HOST: str = os.getenv("API_HOST", "0.0.0.0")
     API_PORT: int = int(os.getenv("API_PORT", "8000"))
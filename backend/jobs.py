@@ -0,0 +1,204 @@
+import asyncio
+import logging
+from datetime import timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from fastapi import HTTPException, status
+from fastapi.responses import JSONResponse
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models import Job, JobModel, JobStatus
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[[Dict[str, Any], AsyncSession], Awaitable[Dict[str, Any]]]
+
+# Job kind -> coroutine that runs the job and returns its JSON result
+JOB_HANDLERS: Dict[str, JobHandler] = {}
+
+# Workers running in this process, woken up when a job is enqueued
+_active_workers: Set["JobWorker"] = set()
+
+def job_handler(kind: str):
+    """
+    Registers a coroutine as the handler of a job kind.
+    """
+    def decorator(handler: JobHandler) -> JobHandler:
+        JOB_HANDLERS[kind] = handler
+        return handler
+    return decorator
+
+async def enqueue_job(kind: str, payload: Dict[str, Any], db: AsyncSession) -> Job:
+    """
+    Stores a pending job and wakes up the workers of this process.
+    """
+    job = JobModel(kind=kind, status=JobStatus.pending.value, payload=payload)
+    db.add(job)
+    await db.commit()
+    for worker in _active_workers:
+        worker.notify()
+    return Job.from_orm(job)
+
+def job_accepted(job: Job) -> JSONResponse:
+    """
+    Builds the 202 response returned when a request is run as a background job.
+    """
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content=job.model_dump(mode="json"),
+        headers={"Location": f"/api/jobs/{job.id}"}
+    )
+
+class JobWorker:
+    """
+    Runs pending jobs from the jobs table.
+
+    Jobs are claimed with FOR UPDATE SKIP LOCKED, so any number of workers,
+    in the API process or started with `python worker.py`, can share the table.
+    A job left running by a stopped worker is requeued once it exceeds the
+    timeout, up to `max_attempts` times.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        concurrency: int,
+        poll_interval: float,
+        timeout: float,
+        max_attempts: int
+    ):
+        self.session_factory = session_factory
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+        self.max_attempts = max_attempts
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+
+    async def start(self):
+        """
+        Starts the worker tasks.
+        """
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._run()) for _ in range(self.concurrency)]
+        _active_workers.add(self)
+        logger.info(f"Job worker started with {self.concurrency} tasks")
+
+    async def stop(self):
+        """
+        Cancels the worker tasks; interrupted jobs are requeued after the timeout.
+        """
+        _active_workers.discard(self)
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        logger.info("Job worker stopped")
+
+    def notify(self):
+        """
+        Wakes up idle worker tasks.
+        """
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def run_pending(self) -> int:
+        """
+        Runs pending jobs one by one until none are left and returns how many ran.
+        """
+        count = 0
+        while await self._run_next():
+            count += 1
+        return count
+
+    async def _run(self):
+        while True:
+            try:
+                if await self._run_next():
+                    continue
+                await self._requeue_stale()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Keep the worker alive if the database is briefly unavailable
+                logger.error(f"Job worker error: {e}")
+
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _run_next(self) -> bool:
+        job = await self._claim()
+        if job is None:
+            return False
+
+        job_id, kind, payload = job
+        logger.info(f"Running job {job_id} ({kind})")
+        values: Dict[str, Any]
+        try:
+            handler = JOB_HANDLERS.get(kind)
+            if handler is None:
+                raise ValueError(f"Unknown job kind: {kind}")
+            async with self.session_factory() as db:
+                result = await asyncio.wait_for(handler(payload, db), timeout=self.timeout)
+            values = {"status": JobStatus.completed.value, "result": result}
+        except HTTPException as e:
+            values = {"status": JobStatus.failed.value, "error": str(e.detail)}
+        except asyncio.TimeoutError:
+            values = {"status": JobStatus.failed.value, "error": "Job timed out"}
+        except Exception as e:
+            logger.error(f"Job {job_id} failed: {e}")
+            values = {"status": JobStatus.failed.value, "error": str(e)}
+
+        async with self.session_factory() as db:
+            await db.execute(
+                update(JobModel)
+                .where(JobModel.id == job_id)
+                .values(**values, finished_at=func.now())
+            )
+            await db.commit()
+        return True
+
+    async def _claim(self):
+        async with self.session_factory() as db:
+            oldest_pending = (
+                select(JobModel.id)
+                .where(JobModel.status == JobStatus.pending.value)
+                .order_by(JobModel.created_at)
+                .limit(1)
+                .with_for_update(skip_locked=True)
+                .scalar_subquery()
+            )
+            result = await db.execute(
+                update(JobModel)
+                .where(JobModel.id == oldest_pending)
+                .values(status=JobStatus.running.value, started_at=func.now(), attempts=JobModel.attempts + 1)
+                .returning(JobModel.id, JobModel.kind, JobModel.payload)
+            )
+            job = result.first()
+            await db.commit()
+            return job
+
+    async def _requeue_stale(self):
+        stale = (
+            update(JobModel)
+            .where(
+                JobModel.status == JobStatus.running.value,
+                # A little grace period past the handler timeout for the final update
+                JobModel.started_at < func.now() - timedelta(seconds=self.timeout * 2),
+            )
+        )
+        async with self.session_factory() as db:
+            await db.execute(
+                stale.where(JobModel.attempts < self.max_attempts)
+                .values(status=JobStatus.pending.value, started_at=None)
+            )
+            await db.execute(
+                stale.where(JobModel.attempts >= self.max_attempts)
+                .values(status=JobStatus.failed.value, error="Job was interrupted too many times", finished_at=func.now())
+            )
+            await db.commit()
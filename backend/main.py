@@ -2,14 +2,15 @@ from fastapi import FastAPI, Depends, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
-from sqlalchemy.orm import Session
+from contextlib import asynccontextmanager
 from typing import List
 import logging
 import os
 
-from database import get_db
+from database import AsyncSessionLocal, engine
+from jobs import JobWorker
 from models import QuestionCreate, Question, Tag, Interview, Report
-from routes import questions, tags, interviews, reports
+from routes import questions, tags, interviews, reports, stats, jobs
 from config import settings
 
 # Configure logging
@@ -19,12 +20,34 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Manage application-wide resources"""
+    # Run background jobs in this process unless a separate worker does
+    worker = None
+    if settings.JOB_WORKER_ENABLED:
+        worker = JobWorker(
+            AsyncSessionLocal,
+            settings.JOB_WORKER_CONCURRENCY,
+            settings.JOB_POLL_INTERVAL,
+            settings.JOB_TIMEOUT,
+            settings.JOB_MAX_ATTEMPTS
+        )
+        await worker.start()
+    yield
+    if worker is not None:
+        await worker.stop()
+    # Close pooled database connections on shutdown
+    await engine.dispose()
+    logger.info("Database connections closed")
+
 app = FastAPI(
     title="Interviewer API",
     description="API for interview preparation platform",
     version="0.1.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    lifespan=lifespan,
 )
 
 # Get CORS origins from environment or use defaults
@@ -40,6 +63,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Location"],
 )
 
 # Custom exception handlers
@@ -66,6 +90,8 @@ app.include_router(questions.router, prefix="/api", tags=["questions"])
 app.include_router(tags.router, prefix="/api", tags=["tags"])
 app.include_router(interviews.router, prefix="/api", tags=["interviews"])
 app.include_router(reports.router, prefix="/api", tags=["reports"])
+app.include_router(stats.router, prefix="/api", tags=["stats"])
+app.include_router(jobs.router, prefix="/api", tags=["jobs"])
 
 @app.get("/", summary="Root endpoint", description="Returns a welcome message")
 def read_root():
@@ -0,0 +1,32 @@
+"""Add the embedding_cache table
+
+Revision ID: 3f9a2c7d41e8
+Revises: b0c7eb4711a6
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from pgvector.sqlalchemy import Vector
+
+
+# revision identifiers, used by Alembic.
+revision = '3f9a2c7d41e8'
+down_revision = 'b0c7eb4711a6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'embedding_cache',
+        sa.Column('key', sa.String(length=64), primary_key=True),
+        sa.Column('model', sa.String(length=255), nullable=False),
+        sa.Column('dimension', sa.Integer(), nullable=False),
+        sa.Column('embedding', Vector(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+
+
+def downgrade():
+    op.drop_table('embedding_cache')
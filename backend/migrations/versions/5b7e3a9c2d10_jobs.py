@@ -0,0 +1,39 @@
+"""Add the jobs table for background LLM requests
+
+Revision ID: 5b7e3a9c2d10
+Revises: 8d21e6b5c0f4
+Create Date: 2026-10-17 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '5b7e3a9c2d10'
+down_revision = '8d21e6b5c0f4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'jobs',
+        sa.Column('id', postgresql.UUID(), primary_key=True, server_default=sa.text('uuid_generate_v4()')),
+        sa.Column('kind', sa.String(length=50), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False, server_default='pending'),
+        sa.Column('payload', postgresql.JSONB(), nullable=False),
+        sa.Column('result', postgresql.JSONB()),
+        sa.Column('error', sa.Text()),
+        sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column('started_at', sa.DateTime(timezone=True)),
+        sa.Column('finished_at', sa.DateTime(timezone=True)),
+    )
+    op.create_index('idx_jobs_status_created', 'jobs', ['status', 'created_at'])
+
+
+def downgrade():
+    op.drop_index('idx_jobs_status_created', table_name='jobs')
+    op.drop_table('jobs')
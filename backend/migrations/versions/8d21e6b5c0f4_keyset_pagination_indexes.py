@@ -0,0 +1,37 @@
+"""Add tags.created_at and indexes for keyset pagination
+
+Revision ID: 8d21e6b5c0f4
+Revises: 3f9a2c7d41e8
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d21e6b5c0f4'
+down_revision = '3f9a2c7d41e8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        'tags',
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now())
+    )
+    op.create_index('idx_questions_created_id', 'questions', ['created_at', 'id'])
+    op.create_index('idx_tags_created_id', 'tags', ['created_at', 'id'])
+    op.create_index('idx_interviews_created_id', 'interviews', ['created_at', 'id'])
+    op.create_index('idx_reports_created_id', 'reports', ['created_at', 'id'])
+    op.create_index('idx_question_tags_tag', 'question_tags', ['tag_id', 'question_id'])
+
+
+def downgrade():
+    op.drop_index('idx_question_tags_tag', table_name='question_tags')
+    op.drop_index('idx_reports_created_id', table_name='reports')
+    op.drop_index('idx_interviews_created_id', table_name='interviews')
+    op.drop_index('idx_tags_created_id', table_name='tags')
+    op.drop_index('idx_questions_created_id', table_name='questions')
+    op.drop_column('tags', 'created_at')
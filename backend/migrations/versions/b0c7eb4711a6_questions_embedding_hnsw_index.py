@@ -0,0 +1,36 @@
+"""Store question embeddings as halfvec and add an HNSW index
+
+Revision ID: b0c7eb4711a6
+Revises: 
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b0c7eb4711a6'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # vector(3072) is above the 2000-dimension index limit, halfvec allows up to 4000
+    op.execute(
+        "ALTER TABLE questions ALTER COLUMN vector_embedding TYPE halfvec(3072) "
+        "USING vector_embedding::halfvec(3072)"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_questions_embedding_hnsw ON questions "
+        "USING hnsw (vector_embedding halfvec_cosine_ops) WITH (m = 16, ef_construction = 64)"
+    )
+
+
+def downgrade():
+    op.execute("DROP INDEX IF EXISTS idx_questions_embedding_hnsw")
+    op.execute(
+        "ALTER TABLE questions ALTER COLUMN vector_embedding TYPE vector(3072) "
+        "USING vector_embedding::vector(3072)"
+    )
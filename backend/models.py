@@ -3,10 +3,10 @@ from datetime import datetime
 from typing import List, Optional, Dict, Any
 from enum import Enum
 from sqlalchemy import Column, String, Text, Integer, Float, ForeignKey, DateTime, Enum as SQLAlchemyEnum
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import relationship
 from pydantic import BaseModel, Field
-from pgvector.sqlalchemy import Vector
+from pgvector.sqlalchemy import HALFVEC, Vector
 
 from database import Base
 from config import settings
@@ -23,9 +23,10 @@ class QuestionModel(Base):
     
     id = Column(UUID, primary_key=True, default=uuid.uuid4)
     text = Column(Text, nullable=False)
-    difficulty_level = Column(SQLAlchemyEnum(DifficultyLevel), nullable=False)
+    difficulty_level = Column(SQLAlchemyEnum(DifficultyLevel, name="difficulty_level"), nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
-    vector_embedding = Column(Vector(settings.VECTOR_DIMENSION))
+    # Stored as half-precision so the column stays within pgvector's HNSW dimension limit
+    vector_embedding = Column(HALFVEC(settings.VECTOR_DIMENSION))
     
     # Relationships
     tags = relationship("TagModel", secondary="question_tags", back_populates="questions")
@@ -36,6 +37,7 @@ class TagModel(Base):
     id = Column(UUID, primary_key=True, default=uuid.uuid4)
     name = Column(String(255), nullable=False, unique=True)
     description = Column(Text)
+    created_at = Column(DateTime, default=datetime.utcnow)
     
     # Relationships
     questions = relationship("QuestionModel", secondary="question_tags", back_populates="tags")
@@ -53,7 +55,7 @@ class InterviewModel(Base):
     title = Column(String(255), nullable=False)
     description = Column(Text)
     duration_minutes = Column(Integer)
-    difficulty_level = Column(SQLAlchemyEnum(DifficultyLevel), nullable=False)
+    difficulty_level = Column(SQLAlchemyEnum(DifficultyLevel, name="difficulty_level"), nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # Relationships
@@ -89,13 +91,43 @@ class ReportModel(Base):
     interview_id = Column(UUID, ForeignKey("interviews.id", ondelete="CASCADE"))
     feedback = Column(Text)
     assessment = Column(Text)
-    achieved_level = Column(SQLAlchemyEnum(DifficultyLevel))
+    achieved_level = Column(SQLAlchemyEnum(DifficultyLevel, name="difficulty_level"))
     score = Column(Float)
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # Relationships
     interview = relationship("InterviewModel", back_populates="reports")
 
+class EmbeddingCacheModel(Base):
+    __tablename__ = "embedding_cache"
+    
+    # sha256 of model name, dimension and normalized text
+    key = Column(String(64), primary_key=True)
+    model = Column(String(255), nullable=False)
+    dimension = Column(Integer, nullable=False)
+    embedding = Column(Vector(), nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+class JobStatus(str, Enum):
+    pending = "pending"
+    running = "running"
+    completed = "completed"
+    failed = "failed"
+
+class JobModel(Base):
+    __tablename__ = "jobs"
+    
+    id = Column(UUID, primary_key=True, default=uuid.uuid4)
+    kind = Column(String(50), nullable=False)
+    status = Column(String(20), nullable=False, default=JobStatus.pending.value)
+    payload = Column(JSONB, nullable=False)
+    result = Column(JSONB)
+    error = Column(Text)
+    attempts = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+
 # Pydantic models for API
 
 class TagBase(BaseModel):
@@ -181,10 +213,15 @@ class Report(ReportBase):
 
 class QuestionGenerateRequest(BaseModel):
     prompt: str
+    # Skip the semantic cache and always call the LLM
+    bypass_cache: bool = False
 
 class QuestionGenerateResponse(BaseModel):
     questions: List[Question]
 
+class QuestionSearchResult(Question):
+    similarity: float
+
 class InterviewGenerateRequest(BaseModel):
     prompt: str
     tag_name: Optional[str] = None
@@ -193,4 +230,18 @@ class InterviewSubmitRequest(BaseModel):
     answers: List[AnswerCreate]
 
 class InterviewSubmitResponse(BaseModel):
-    report: Report 
\ No newline at end of file
+    report: Report
+
+class Job(BaseModel):
+    id: uuid.UUID
+    kind: str
+    status: JobStatus
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    attempts: int = 0
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True 
\ No newline at end of file
@@ -0,0 +1,60 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+from uuid import UUID
+
+from fastapi import HTTPException, Response
+from sqlalchemy import DateTime, Select, literal, tuple_
+
+# Response header carrying the cursor of the next page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def encode_cursor(created_at: datetime, id: UUID) -> str:
+    """
+    Encodes the sort key of the last row of a page into an opaque cursor.
+    """
+    payload = json.dumps({"created_at": created_at.isoformat(), "id": str(id)})
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    """
+    Decodes a cursor produced by encode_cursor.
+
+    Raises:
+        HTTPException: 400 if the cursor is malformed
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return datetime.fromisoformat(payload["created_at"]), UUID(payload["id"])
+    except (binascii.Error, UnicodeError, ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def paginate(query: Select, model: Any, limit: int, skip: int = 0, cursor: Optional[str] = None) -> Select:
+    """
+    Orders a query by (created_at, id), newest first, and selects one page.
+
+    With a cursor the page starts right after the cursor row using a keyset
+    condition that is served by the (created_at, id) index, otherwise the
+    legacy OFFSET is applied. One extra row is fetched to detect a next page.
+    """
+    query = query.order_by(model.created_at.desc(), model.id.desc())
+    if cursor:
+        created_at, id = decode_cursor(cursor)
+        query = query.where(
+            tuple_(model.created_at, model.id)
+            < tuple_(literal(created_at, DateTime(timezone=True)), literal(id, model.id.type))
+        )
+    elif skip:
+        query = query.offset(skip)
+    return query.limit(limit + 1)
+
+def page_items(rows: List[Any], limit: int, response: Response) -> List[Any]:
+    """
+    Trims the extra row fetched by paginate and sets the next page cursor header.
+    """
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(rows[-1].created_at, rows[-1].id)
+    return rows
@@ -1,40 +1,192 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List, Optional
+import json
+import logging
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from typing import Any, Dict, List, Optional, Tuple
 from uuid import UUID
 
-from database import get_db
+from database import AsyncSessionLocal, get_db
+from jobs import enqueue_job, job_accepted, job_handler
+from pagination import paginate, page_items
 from models import (
     Interview, InterviewCreate, InterviewModel, 
     QuestionModel, InterviewQuestionModel, AnswerModel,
     InterviewGenerateRequest, InterviewSubmitRequest, 
-    InterviewSubmitResponse, ReportModel, Report, Answer
+    InterviewSubmitResponse, ReportModel, Report, Answer, TagModel, DifficultyLevel, Job
 )
-from ai.llm import generate_interview, evaluate_answers
+from ai.llm import (
+    generate_interview, evaluate_answers, stream_evaluate_answers,
+    get_embedding, format_question_info, estimate_tokens
+)
+from config import settings
+from routes.questions import search_similar_questions
+
+# Configure logger
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-@router.post("/interviews/generate", response_model=Interview)
+@router.post("/interviews/generate", response_model=Interview, responses={202: {"model": Job}})
 async def create_interview_from_prompt(
     request: InterviewGenerateRequest,
-    db: Session = Depends(get_db)
+    background: bool = False,
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Generates an interview based on a prompt and available questions.
+    
+    With `background=true` the request returns 202 with a job to poll at /api/jobs/{job_id}.
     """
-    # Get questions from the database
-    questions_query = db.query(QuestionModel)
+    if background:
+        job = await enqueue_job("interviews.generate", request.model_dump(mode="json"), db)
+        return job_accepted(job)
     
-    # Filter by tag if specified
-    if request.tag_name:
-        from models import TagModel
-        questions_query = (
-            questions_query
-            .join(QuestionModel.tags)
-            .filter(TagModel.name == request.tag_name)
-        )
+    return await generate_interview_from_prompt(request, db)
+
+@router.get("/interviews", response_model=List[Interview])
+async def read_interviews(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Gets a list of all interviews, newest first.
+    
+    Pass the X-Next-Cursor header of a page as `cursor` to get the next page.
+    """
+    query = select(InterviewModel).options(
+        selectinload(InterviewModel.questions).selectinload(QuestionModel.tags)
+    )
+    result = await db.execute(paginate(query, InterviewModel, limit, skip, cursor))
+    interviews = page_items(result.scalars().all(), limit, response)
+    return [Interview.from_orm(interview) for interview in interviews]
+
+@router.get("/interviews/{interview_id}", response_model=Interview)
+async def read_interview(
+    interview_id: UUID,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Gets a specific interview by ID.
+    """
+    interview = await get_interview_with_questions(interview_id, db)
+    if interview is None:
+        raise HTTPException(status_code=404, detail="Interview not found")
+    return Interview.from_orm(interview)
+
+@router.post("/interviews/{interview_id}/submit", response_model=InterviewSubmitResponse, responses={202: {"model": Job}})
+async def submit_interview_answers(
+    interview_id: UUID,
+    request: InterviewSubmitRequest,
+    background: bool = False,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Submit answers to an interview's questions and get an evaluation.
+    
+    With `background=true` the request returns 202 with a job to poll at /api/jobs/{job_id}.
+    """
+    # Check if the interview exists
+    interview = await get_interview_with_questions(interview_id, db)
+    if not interview:
+        raise HTTPException(status_code=404, detail="Interview not found")
+    
+    if background:
+        payload = {"interview_id": str(interview_id), "request": request.model_dump(mode="json")}
+        job = await enqueue_job("interviews.submit", payload, db)
+        return job_accepted(job)
+    
+    return await evaluate_submission(interview, request, db)
+
+@router.post("/interviews/{interview_id}/submit/stream")
+async def submit_interview_answers_stream(
+    interview_id: UUID,
+    request: InterviewSubmitRequest,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Submit answers to an interview's questions and stream the evaluation as Server-Sent Events.
+    
+    An `answer_evaluation` event is sent for each answer as soon as it is evaluated,
+    followed by a `report` event with the same body as the submit endpoint.
+    """
+    # Check if the interview exists
+    interview = await get_interview_with_questions(interview_id, db)
+    if not interview:
+        raise HTTPException(status_code=404, detail="Interview not found")
+    
+    questions_data, answers_data = build_evaluation_input(interview, request)
+    
+    async def event_stream():
+        evaluation = None
+        async for event in stream_evaluate_answers(questions_data, answers_data):
+            if event["type"] == "answer_evaluation":
+                yield format_sse("answer_evaluation", {
+                    "question_id": event["question_id"],
+                    "evaluation": event["evaluation"]
+                })
+            else:
+                evaluation = event["evaluation"]
+        
+        # Persist the results the same way the submit endpoint does
+        async with AsyncSessionLocal() as session:
+            response = await save_evaluation(interview_id, request, evaluation, session)
+        yield format_sse("report", response.model_dump(mode="json"))
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+# Helper functions
+
+@job_handler("interviews.generate")
+async def run_generate_interview_job(payload: Dict[str, Any], db: AsyncSession) -> Dict[str, Any]:
+    """
+    Runs a background /interviews/generate request.
+    """
+    interview = await generate_interview_from_prompt(InterviewGenerateRequest(**payload), db)
+    return interview.model_dump(mode="json")
+
+@job_handler("interviews.submit")
+async def run_submit_interview_job(payload: Dict[str, Any], db: AsyncSession) -> Dict[str, Any]:
+    """
+    Runs a background /interviews/{interview_id}/submit request.
+    """
+    interview_id = UUID(payload["interview_id"])
+    interview = await get_interview_with_questions(interview_id, db)
+    if not interview:
+        raise HTTPException(status_code=404, detail="Interview not found")
     
-    questions = questions_query.all()
+    response = await evaluate_submission(interview, InterviewSubmitRequest(**payload["request"]), db)
+    return response.model_dump(mode="json")
+
+async def generate_interview_from_prompt(request: InterviewGenerateRequest, db: AsyncSession) -> Interview:
+    """
+    Generates an interview based on a prompt and available questions.
+    """
+    if settings.INTERVIEW_CANDIDATE_LIMIT > 0:
+        # Keep only the questions closest to the request
+        embedding = await get_embedding(request.prompt)
+        questions = await select_interview_candidates(
+            embedding, settings.INTERVIEW_CANDIDATE_LIMIT, request.tag_name, db
+        )
+    else:
+        # Get questions from the database
+        questions_query = select(QuestionModel).options(selectinload(QuestionModel.tags))
+        
+        # Filter by tag if specified
+        if request.tag_name:
+            questions_query = questions_query.where(QuestionModel.tags.any(TagModel.name == request.tag_name))
+        
+        result = await db.execute(questions_query)
+        questions = result.scalars().all()
     
     # If no questions are found, return an error
     if not questions:
@@ -54,6 +206,9 @@ async def create_interview_from_prompt(
             "tags": tags
         })
     
+    if settings.INTERVIEW_CANDIDATE_LIMIT > 0:
+        await log_candidate_savings(questions_data, request.tag_name, db)
+    
     # Generate interview using LLM
     interview_data = await generate_interview(
         request.prompt, request.tag_name, questions_data
@@ -73,64 +228,90 @@ async def create_interview_from_prompt(
     
     return db_interview
 
-@router.get("/interviews", response_model=List[Interview])
-async def read_interviews(
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db)
-):
+async def evaluate_submission(
+    interview: InterviewModel,
+    request: InterviewSubmitRequest,
+    db: AsyncSession
+) -> InterviewSubmitResponse:
     """
-    Gets a list of all interviews.
+    Evaluates submitted answers and saves them with the report.
     """
-    interviews = db.query(InterviewModel).offset(skip).limit(limit).all()
-    return [Interview.from_orm(interview) for interview in interviews]
+    questions_data, answers_data = build_evaluation_input(interview, request)
+    
+    # Evaluate answers using LLM
+    evaluation = await evaluate_answers(questions_data, answers_data)
+    
+    return await save_evaluation(interview.id, request, evaluation, db)
 
-@router.get("/interviews/{interview_id}", response_model=Interview)
-async def read_interview(
-    interview_id: UUID,
-    db: Session = Depends(get_db)
-):
+async def select_interview_candidates(
+    embedding: List[float],
+    limit: int,
+    tag_name: Optional[str],
+    db: AsyncSession
+) -> List[QuestionModel]:
     """
-    Gets a specific interview by ID.
+    Selects up to `limit` questions most similar to the request embedding.
+    
+    Each difficulty level is searched through the vector index separately and
+    the results are interleaved by rank, so the candidates keep a spread of
+    difficulties even when one level dominates the nearest neighbours.
     """
-    interview = db.query(InterviewModel).filter(InterviewModel.id == interview_id).first()
-    if interview is None:
-        raise HTTPException(status_code=404, detail="Interview not found")
-    return Interview.from_orm(interview)
+    per_level = [
+        await search_similar_questions(db, embedding, limit=limit, difficulty=level.value, tag=tag_name)
+        for level in DifficultyLevel
+    ]
+    
+    candidates = []
+    for rank in range(limit):
+        # Take the next best question of each level, the closest one first
+        row = sorted(
+            (results[rank] for results in per_level if rank < len(results)),
+            key=lambda r: r[1]
+        )
+        candidates.extend(question for question, _ in row)
+        if len(candidates) >= limit or not row:
+            break
+    
+    return candidates[:limit]
 
-@router.post("/interviews/{interview_id}/submit", response_model=InterviewSubmitResponse)
-async def submit_interview_answers(
-    interview_id: UUID,
-    request: InterviewSubmitRequest,
-    db: Session = Depends(get_db)
-):
+async def log_candidate_savings(questions_data: List[Dict[str, Any]], tag_name: Optional[str], db: AsyncSession):
     """
-    Submit answers to an interview's questions and get an evaluation.
+    Logs how many prompt tokens candidate pruning saved compared to sending every question.
     """
-    # Check if the interview exists
-    interview = db.query(InterviewModel).filter(InterviewModel.id == interview_id).first()
-    if not interview:
-        raise HTTPException(status_code=404, detail="Interview not found")
-    
-    # Get interview questions with tags
-    questions = []
-    for question in db.query(InterviewModel).filter(InterviewModel.id == interview_id).first().questions:
-        tags = [tag.name for tag in question.tags]
-        questions.append({
-            "question": question,
-            "tags": tags
-        })
+    query = select(func.count()).select_from(QuestionModel)
+    if tag_name:
+        query = query.where(QuestionModel.tags.any(TagModel.name == tag_name))
+    total = (await db.execute(query)).scalar_one()
     
-    # Prepare questions data for evaluation
+    candidate_tokens = sum(estimate_tokens(format_question_info(q)) for q in questions_data)
+    average_tokens = candidate_tokens / len(questions_data) if questions_data else 0
+    saved_tokens = int((total - len(questions_data)) * average_tokens)
+    logger.info(
+        f"Interview candidates: {len(questions_data)} of {total} questions, "
+        f"~{candidate_tokens} prompt tokens, ~{saved_tokens} tokens saved"
+    )
+
+def format_sse(event: str, data: Dict[str, Any]) -> str:
+    """
+    Formats a Server-Sent Event with a JSON payload.
+    """
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def build_evaluation_input(
+    interview: InterviewModel,
+    request: InterviewSubmitRequest
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Prepares the questions and answers of a submission for evaluation.
+    """
+    # Prepare questions data with tags
     questions_data = []
-    for q in questions:
-        question = q["question"]
-        tags = q["tags"]
+    for question in interview.questions:
         questions_data.append({
             "id": str(question.id),
             "text": question.text,
             "difficulty_level": question.difficulty_level.value,
-            "tags": tags
+            "tags": [tag.name for tag in question.tags]
         })
     
     # Get answers
@@ -141,9 +322,17 @@ async def submit_interview_answers(
             "user_answer": answer_data.user_answer
         })
     
-    # Evaluate answers using LLM
-    evaluation = await evaluate_answers(questions_data, answers_data)
-    
+    return questions_data, answers_data
+
+async def save_evaluation(
+    interview_id: UUID,
+    request: InterviewSubmitRequest,
+    evaluation: Dict[str, Any],
+    db: AsyncSession
+) -> InterviewSubmitResponse:
+    """
+    Saves submitted answers with the correct answers from an evaluation and creates the report.
+    """
     # Save answers with correct answers from evaluation
     for answer_data in request.answers:
         question_id = str(answer_data.question_id)
@@ -154,10 +343,13 @@ async def submit_interview_answers(
             correct_answer = evaluation["question_evaluations"][question_id].get("correct_answer")
         
         # Create or update answer in database
-        answer = db.query(AnswerModel).filter(
-            AnswerModel.interview_id == interview_id,
-            AnswerModel.question_id == answer_data.question_id
-        ).first()
+        result = await db.execute(
+            select(AnswerModel).where(
+                AnswerModel.interview_id == interview_id,
+                AnswerModel.question_id == answer_data.question_id
+            )
+        )
+        answer = result.scalars().first()
         
         if answer:
             # Update existing answer
@@ -183,21 +375,31 @@ async def submit_interview_answers(
     )
     
     db.add(report)
-    db.commit()
-    db.refresh(report)
+    await db.commit()
     
     # Создаем Pydantic модель отчета
     pydantic_report = Report.from_orm(report)
     
     # Вручную загружаем ответы для отчета
-    answers = db.query(AnswerModel).filter(AnswerModel.interview_id == interview_id).all()
+    result = await db.execute(select(AnswerModel).where(AnswerModel.interview_id == interview_id))
+    answers = result.scalars().all()
     pydantic_report.answers = [Answer.from_orm(answer) for answer in answers]
     
     return InterviewSubmitResponse(report=pydantic_report)
 
-# Helper functions
+async def get_interview_with_questions(interview_id: UUID, db: AsyncSession) -> Optional[InterviewModel]:
+    """
+    Loads an interview together with its questions and their tags.
+    """
+    result = await db.execute(
+        select(InterviewModel)
+        .options(selectinload(InterviewModel.questions).selectinload(QuestionModel.tags))
+        .where(InterviewModel.id == interview_id)
+        .execution_options(populate_existing=True)
+    )
+    return result.scalars().first()
 
-async def create_interview(interview: InterviewCreate, db: Session):
+async def create_interview(interview: InterviewCreate, db: AsyncSession):
     """
     Creates an interview in the database.
     """
@@ -211,13 +413,12 @@ async def create_interview(interview: InterviewCreate, db: Session):
     
     # Add interview to the database
     db.add(db_interview)
-    db.commit()
-    db.refresh(db_interview)
+    await db.commit()
     
     # Add interview questions
     for i, question_id in enumerate(interview.question_ids):
         # Check if the question exists
-        question = db.query(QuestionModel).filter(QuestionModel.id == question_id).first()
+        question = await db.get(QuestionModel, question_id)
         if question:
             # Link the interview with the question
             db.add(InterviewQuestionModel(
@@ -226,7 +427,7 @@ async def create_interview(interview: InterviewCreate, db: Session):
                 order_num=i + 1
             ))
     
-    db.commit()
-    db.refresh(db_interview)
+    await db.commit()
     
+    db_interview = await get_interview_with_questions(db_interview.id, db)
     return Interview.from_orm(db_interview) 
\ No newline at end of file
@@ -0,0 +1,61 @@
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from uuid import UUID
+
+from config import settings
+from database import AsyncSessionLocal, get_db
+from models import Job, JobModel, JobStatus
+from routes.interviews import format_sse
+
+router = APIRouter()
+
+@router.get("/jobs/{job_id}", response_model=Job)
+async def read_job(
+    job_id: UUID,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Gets the status of a background job and its result once it has finished.
+    """
+    job = await db.get(JobModel, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return Job.from_orm(job)
+
+@router.get("/jobs/{job_id}/events")
+async def stream_job_events(
+    job_id: UUID,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Streams the status of a background job as Server-Sent Events.
+    
+    A `status` event is sent whenever the status changes; the stream ends with
+    a `completed` or `failed` event carrying the job with its result.
+    """
+    job = await db.get(JobModel, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    async def event_stream():
+        last_status = None
+        while True:
+            async with AsyncSessionLocal() as session:
+                job = Job.from_orm(await session.get(JobModel, job_id))
+            
+            if job.status in (JobStatus.completed, JobStatus.failed):
+                yield format_sse(job.status.value, job.model_dump(mode="json"))
+                return
+            if job.status != last_status:
+                last_status = job.status
+                yield format_sse("status", {"id": str(job.id), "status": job.status.value})
+            
+            await asyncio.sleep(settings.JOB_POLL_INTERVAL)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
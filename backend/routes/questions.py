@@ -1,179 +1,367 @@
 import logging
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+import math
+import uuid
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 from sqlalchemy.exc import SQLAlchemyError
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Tuple, Union
 from uuid import UUID
 
 from database import get_db
-from models import Question, QuestionCreate, QuestionGenerateRequest, QuestionGenerateResponse, QuestionModel, TagModel, QuestionTagModel
-from ai.llm import generate_questions, get_embedding
-from sqlalchemy import text
+from pagination import paginate, page_items
+from jobs import enqueue_job, job_accepted, job_handler
+from models import Job, Question, QuestionCreate, QuestionGenerateRequest, QuestionGenerateResponse, QuestionSearchResult, QuestionModel, TagModel, QuestionTagModel
+from ai.llm import generate_questions, get_embedding, get_embeddings, generation_cache
+from sqlalchemy import select, text
+from sqlalchemy.dialects.postgresql import insert
+from config import settings
 
 # Configure logger
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-@router.post("/questions/generate", response_model=QuestionGenerateResponse)
+@router.post("/questions/generate", response_model=QuestionGenerateResponse, responses={202: {"model": Job}})
 async def create_questions_from_prompt(
     request: QuestionGenerateRequest,
-    db: Session = Depends(get_db)
+    background: bool = False,
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Generates questions based on a prompt and saves them to the database.
-    """
-    logger.info(f"Generating questions from prompt: {request.prompt[:50]}...")
-    
-    # Generate questions using LLM
-    questions_data = await generate_questions(request.prompt)
     
-    if not questions_data:
-        raise HTTPException(
-            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-            detail="Could not generate questions from the provided prompt"
-        )
-    
-    # Create a list of Question objects
-    questions = []
+    With `background=true` the request returns 202 with a job to poll at /api/jobs/{job_id}.
+    """
+    if background:
+        job = await enqueue_job("questions.generate", request.model_dump(mode="json"), db)
+        return job_accepted(job)
     
-    try:
-        for q_data in questions_data:
-            # Create a question
-            question = QuestionCreate(
-                text=q_data["text"],
-                difficulty_level=q_data["difficulty_level"],
-                tags=q_data["tags"]
-            )
-            
-            # Add the question to the database and retrieve it
-            db_question = await create_question(question, db)
-            questions.append(db_question)
-            
-        return QuestionGenerateResponse(questions=questions)
-    except Exception as e:
-        logger.error(f"Error creating questions: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error creating questions: {str(e)}"
-        )
+    return await generate_questions_from_prompt(request, db)
 
 @router.get("/questions", response_model=List[Question])
 async def read_questions(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     difficulty: Optional[str] = None,
     tag: Optional[str] = None,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
 ):
     """
-    Gets a list of questions with filtering options.
-    """
-    # Base query
-    query = """
-    SELECT DISTINCT q.id, q.text, q.difficulty_level, q.created_at 
-    FROM questions q
+    Gets a list of questions with filtering options, newest first.
+    
+    Pass the X-Next-Cursor header of a page as `cursor` to get the next page.
     """
+    # Questions and their tags are loaded in two queries regardless of the page size
+    query = select(QuestionModel).options(selectinload(QuestionModel.tags))
     
-    # Add JOIN with the tags table if a tag is specified
+    # Filter by tag and difficulty
     if tag:
-        query += """
-        JOIN question_tags qt ON q.id = qt.question_id
-        JOIN tags t ON qt.tag_id = t.id
-        WHERE t.name = :tag
-        """
-        if difficulty:
-            query += " AND q.difficulty_level = :difficulty"
-    elif difficulty:
-        query += " WHERE q.difficulty_level = :difficulty"
-    
-    # Add LIMIT and OFFSET
-    query += " ORDER BY q.created_at DESC LIMIT :limit OFFSET :skip"
-    
-    # Execute the query
-    result = db.execute(
-        text(query),
-        {"tag": tag, "difficulty": difficulty, "limit": limit, "skip": skip}
-    )
+        query = query.where(QuestionModel.tags.any(TagModel.name == tag))
+    if difficulty:
+        query = query.where(QuestionModel.difficulty_level == difficulty)
     
-    # Get question IDs
-    question_ids = [row[0] for row in result]
+    result = await db.execute(paginate(query, QuestionModel, limit, skip, cursor))
+    questions = page_items(result.scalars().all(), limit, response)
     
-    # If there are no questions, return an empty list
-    if not question_ids:
-        return []
-    
-    # Get complete question data with tags
-    questions = []
-    for question_id in question_ids:
-        # Get the question
-        question = db.query(QuestionModel).filter(QuestionModel.id == question_id).first()
-        if question:
-            # Convert SQLAlchemy model to Pydantic model
-            questions.append(Question.from_orm(question))
-    
-    return questions
+    return [Question.from_orm(question) for question in questions]
+
+@router.get("/questions/search", response_model=List[QuestionSearchResult])
+async def search_questions(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(10, ge=1, le=100),
+    difficulty: Optional[str] = None,
+    tag: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Searches for questions semantically similar to the provided text.
+    """
+    logger.info(f"Searching questions for: {q[:50]}...")
+
+    # Create an embedding for the search text
+    embedding = await get_embedding(q)
+
+    results = await search_similar_questions(db, embedding, limit=limit, difficulty=difficulty, tag=tag)
+
+    return [
+        QuestionSearchResult(**Question.from_orm(question).model_dump(), similarity=1 - distance)
+        for question, distance in results
+    ]
 
 @router.get("/questions/{question_id}", response_model=Question)
 async def read_question(
     question_id: UUID,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Gets a specific question by ID.
     """
-    question = db.query(QuestionModel).filter(QuestionModel.id == question_id).first()
+    result = await db.execute(
+        select(QuestionModel)
+        .options(selectinload(QuestionModel.tags))
+        .where(QuestionModel.id == question_id)
+    )
+    question = result.scalars().first()
     if question is None:
         raise HTTPException(status_code=404, detail="Question not found")
     return Question.from_orm(question)
 
 # Helper functions
 
-async def create_question(question: QuestionCreate, db: Session):
+@job_handler("questions.generate")
+async def run_generate_questions_job(payload: Dict[str, Any], db: AsyncSession) -> Dict[str, Any]:
     """
-    Creates a question in the database.
+    Runs a background /questions/generate request.
+    """
+    response = await generate_questions_from_prompt(QuestionGenerateRequest(**payload), db)
+    return response.model_dump(mode="json")
+
+async def generate_questions_from_prompt(request: QuestionGenerateRequest, db: AsyncSession) -> QuestionGenerateResponse:
     """
+    Generates questions based on a prompt and saves them to the database.
+    """
+    logger.info(f"Generating questions from prompt: {request.prompt[:50]}...")
+    
+    # Return the result of a similar earlier prompt if there is one
+    prompt_embedding = None
+    if generation_cache is not None:
+        prompt_embedding = await get_embedding(request.prompt)
+        if request.bypass_cache:
+            generation_cache.bypasses += 1
+        else:
+            cached = generation_cache.get(prompt_embedding)
+            if cached is not None:
+                logger.info("Returning cached questions for a similar prompt")
+                return cached
+    
+    # Generate questions using LLM
+    questions_data = await generate_questions(request.prompt)
+    
+    if not questions_data:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Could not generate questions from the provided prompt"
+        )
+    
     try:
-        # Create an embedding for the question
-        embedding = await get_embedding(question.text)
+        # Validate the generated questions
+        questions_to_create = [
+            QuestionCreate(
+                text=q_data["text"],
+                difficulty_level=q_data["difficulty_level"],
+                tags=q_data["tags"]
+            )
+            for q_data in questions_data
+        ]
         
-        # Create a question object
-        db_question = QuestionModel(
-            text=question.text,
-            difficulty_level=question.difficulty_level,
-            vector_embedding=embedding
+        # Embed, deduplicate and save the whole batch at once
+        questions = await create_questions(questions_to_create, db, deduplicate=True)
+        
+        response = QuestionGenerateResponse(questions=questions)
+        if generation_cache is not None:
+            generation_cache.put(prompt_embedding, response)
+        
+        return response
+    except Exception as e:
+        logger.error(f"Error creating questions: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error creating questions: {str(e)}"
         )
+
+async def create_question(question: QuestionCreate, db: AsyncSession):
+    """
+    Creates a question in the database.
+    """
+    questions = await create_questions([question], db)
+    return questions[0]
+
+async def create_questions(questions: List[QuestionCreate], db: AsyncSession, deduplicate: bool = False) -> List[Question]:
+    """
+    Creates several questions in the database.
+
+    Embeddings for the whole batch are requested at once and all rows
+    are committed in a single transaction. With `deduplicate` enabled,
+    near-duplicates of existing questions are skipped or linked to the
+    existing question depending on QUESTION_DEDUP_MODE.
+    """
+    try:
+        # Create embeddings for all questions in one request
+        embeddings = await get_embeddings([question.text for question in questions])
         
-        # Add the question to the database
-        db.add(db_question)
-        db.flush()
+        duplicates = {}
+        if deduplicate and settings.QUESTION_DEDUP_MODE in ("skip", "link"):
+            duplicates = await find_duplicate_questions(db, embeddings)
         
-        # Add tags
-        for tag_name in question.tags:
-            # Стандартизируем имя тега (нижний регистр, без пробелов)
-            tag_name = tag_name.lower().strip()
-            
-            if not tag_name:
+        # Create question objects for the questions that are not duplicates
+        db_questions = {
+            i: QuestionModel(
+                text=question.text,
+                difficulty_level=question.difficulty_level,
+                vector_embedding=embedding
+            )
+            for i, (question, embedding) in enumerate(zip(questions, embeddings))
+            if i not in duplicates
+        }
+        
+        # Add the questions to the database
+        db.add_all(db_questions.values())
+        await db.flush()
+        
+        # Collect the tags of every question, merging duplicates into their originals
+        question_ids = []
+        question_tags = {}
+        for i, question in enumerate(questions):
+            if i in db_questions:
+                question_id = db_questions[i].id
+            elif settings.QUESTION_DEDUP_MODE == "link":
+                duplicate_of = duplicates[i]
+                question_id = db_questions[duplicate_of].id if isinstance(duplicate_of, int) else duplicate_of
+                logger.info(f"Linking generated question to existing question {question_id}")
+            else:
+                logger.info(f"Skipping generated question similar to an existing one: {question.text[:50]}...")
                 continue
-                
-            # Проверяем существует ли тег
-            tag = db.query(TagModel).filter(TagModel.name == tag_name).first()
-            if not tag:
-                # Создаем новый тег
-                tag = TagModel(name=tag_name)
-                db.add(tag)
-                db.flush()
             
-            # Связываем вопрос с тегом
-            db.add(QuestionTagModel(question_id=db_question.id, tag_id=tag.id))
+            if question_id not in question_tags:
+                question_ids.append(question_id)
+                question_tags[question_id] = []
+            question_tags[question_id].extend(question.tags)
         
-        # Фиксируем изменения
-        db.commit()
-        db.refresh(db_question)
+        # Create missing tags and link them to the questions in two statements
+        tag_ids = await upsert_tags(
+            [tag_name for tag_names in question_tags.values() for tag_name in tag_names], db
+        )
+        links = {
+            (question_id, tag_ids[normalize_tag_name(tag_name)])
+            for question_id, tag_names in question_tags.items()
+            for tag_name in tag_names
+            if normalize_tag_name(tag_name)
+        }
+        if links:
+            # Linked duplicates may already have some of these tags
+            await db.execute(
+                insert(QuestionTagModel)
+                .values([{"question_id": question_id, "tag_id": tag_id} for question_id, tag_id in links])
+                .on_conflict_do_nothing()
+            )
+        
+        # Фиксируем изменения одной транзакцией
+        await db.commit()
+        
+        # Reload the batch with its tags in a single query
+        result = await db.execute(
+            select(QuestionModel)
+            .options(selectinload(QuestionModel.tags))
+            .where(QuestionModel.id.in_(question_ids))
+            .execution_options(populate_existing=True)
+        )
+        loaded = result.scalars().all()
+        by_id = {question.id: question for question in loaded}
         
-        return Question.from_orm(db_question)
+        return [Question.from_orm(by_id[question_id]) for question_id in question_ids]
         
     except Exception as e:
-        db.rollback()
-        logger.error(f"Error creating question: {str(e)}")
-        raise e 
\ No newline at end of file
+        await db.rollback()
+        logger.error(f"Error creating questions: {str(e)}")
+        raise e
+
+def normalize_tag_name(tag_name: str) -> str:
+    """
+    Standardizes a tag name (lower case, no surrounding whitespace).
+    """
+    return tag_name.lower().strip()
+
+async def upsert_tags(tag_names: List[str], db: AsyncSession) -> Dict[str, UUID]:
+    """
+    Creates the missing tags and returns the IDs of all given tags by name.
+
+    A single INSERT ... ON CONFLICT statement handles the whole set, so
+    concurrent requests creating the same tag do not fail on tags.name.
+    """
+    names = sorted({normalize_tag_name(tag_name) for tag_name in tag_names} - {""})
+    if not names:
+        return {}
+    
+    statement = insert(TagModel).values([{"id": uuid.uuid4(), "name": name} for name in names])
+    # DO UPDATE (instead of DO NOTHING) makes RETURNING include existing tags;
+    # sorted names keep the row locks in a consistent order
+    statement = statement.on_conflict_do_update(
+        index_elements=[TagModel.name],
+        set_={"name": statement.excluded.name}
+    ).returning(TagModel.id, TagModel.name)
+    
+    result = await db.execute(statement)
+    return {name: tag_id for tag_id, name in result.all()}
+
+async def find_duplicate_questions(db: AsyncSession, embeddings: List[List[float]]) -> Dict[int, Union[int, UUID]]:
+    """
+    Finds near-duplicates among a batch of new question embeddings.
+
+    Maps the index of every duplicate either to the ID of a similar stored
+    question (looked up through the HNSW index) or to the index of an
+    earlier question of the same batch.
+    """
+    threshold = settings.QUESTION_DEDUP_THRESHOLD
+    duplicates = {}
+    for i, embedding in enumerate(embeddings):
+        # Compare with the earlier questions of the batch
+        for j in range(i):
+            if j not in duplicates and cosine_similarity(embedding, embeddings[j]) >= threshold:
+                duplicates[i] = j
+                break
+        if i in duplicates:
+            continue
+        
+        # Compare with the closest stored question
+        nearest = await search_similar_questions(db, embedding, limit=1)
+        if nearest and 1 - nearest[0][1] >= threshold:
+            duplicates[i] = nearest[0][0].id
+    return duplicates
+
+def cosine_similarity(a: List[float], b: List[float]) -> float:
+    """
+    Computes the cosine similarity of two vectors.
+    """
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+async def search_similar_questions(
+    db: AsyncSession,
+    embedding: List[float],
+    limit: int = 10,
+    difficulty: Optional[str] = None,
+    tag: Optional[str] = None
+) -> List[Tuple[QuestionModel, float]]:
+    """
+    Finds the questions closest to an embedding using the HNSW index.
+
+    Returns (question, cosine distance) pairs ordered from the most similar.
+    """
+    # Tune the index scan for this transaction only
+    await db.execute(text(f"SET LOCAL hnsw.ef_search = {int(settings.VECTOR_SEARCH_EF_SEARCH)}"))
+    if settings.VECTOR_SEARCH_ITERATIVE_SCAN in ("strict_order", "relaxed_order"):
+        # Keep scanning the index when filters discard candidates
+        await db.execute(text(f"SET LOCAL hnsw.iterative_scan = {settings.VECTOR_SEARCH_ITERATIVE_SCAN}"))
+
+    distance = QuestionModel.vector_embedding.cosine_distance(embedding).label("distance")
+    query = (
+        select(QuestionModel, distance)
+        .options(selectinload(QuestionModel.tags))
+        .where(QuestionModel.vector_embedding.isnot(None))
+    )
+
+    if difficulty:
+        query = query.where(QuestionModel.difficulty_level == difficulty)
+    if tag:
+        # EXISTS keeps the scan on questions so the index order can be used
+        query = query.where(QuestionModel.tags.any(TagModel.name == tag))
+
+    result = await db.execute(query.order_by(distance).limit(limit))
+    results = result.all()
+
+    # Relaxed iterative scans may return slightly out-of-order rows
+    return sorted(((question, float(dist)) for question, dist in results), key=lambda r: r[1])
@@ -1,34 +1,41 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 from uuid import UUID
 
 from database import get_db
+from pagination import paginate, page_items
 from models import Report, ReportModel, Answer, AnswerModel
 
 router = APIRouter()
 
 @router.get("/reports", response_model=List[Report])
 async def read_reports(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
 ):
     """
-    Gets a list of all interview reports.
+    Gets a list of all interview reports, newest first.
+    
+    Pass the X-Next-Cursor header of a page as `cursor` to get the next page.
     """
-    reports = db.query(ReportModel).offset(skip).limit(limit).all()
+    result = await db.execute(paginate(select(ReportModel), ReportModel, limit, skip, cursor))
+    reports = page_items(result.scalars().all(), limit, response)
     return [Report.from_orm(report) for report in reports]
 
 @router.get("/reports/{report_id}", response_model=Report)
 async def read_report(
     report_id: UUID,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Gets a specific report by ID.
     """
-    report = db.query(ReportModel).filter(ReportModel.id == report_id).first()
+    report = await db.get(ReportModel, report_id)
     if report is None:
         raise HTTPException(status_code=404, detail="Report not found")
     
@@ -36,7 +43,8 @@ async def read_report(
     pydantic_report = Report.from_orm(report)
     
     # Вручную загружаем ответы
-    answers = db.query(AnswerModel).filter(AnswerModel.interview_id == report.interview_id).all()
+    result = await db.execute(select(AnswerModel).where(AnswerModel.interview_id == report.interview_id))
+    answers = result.scalars().all()
     pydantic_report.answers = [Answer.from_orm(answer) for answer in answers]
     
     return pydantic_report
@@ -44,33 +52,34 @@ async def read_report(
 @router.get("/reports/{report_id}/answers", response_model=List[Answer])
 async def read_report_answers(
     report_id: UUID,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Gets a list of user answers for a specific report.
     """
     # First find the report to get the interview_id
-    report = db.query(ReportModel).filter(ReportModel.id == report_id).first()
+    report = await db.get(ReportModel, report_id)
     if report is None:
         raise HTTPException(status_code=404, detail="Report not found")
     
     # Get answers by interview_id
-    answers = db.query(AnswerModel).filter(AnswerModel.interview_id == report.interview_id).all()
+    result = await db.execute(select(AnswerModel).where(AnswerModel.interview_id == report.interview_id))
+    answers = result.scalars().all()
     return [Answer.from_orm(answer) for answer in answers]
 
 @router.delete("/reports/{report_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_report(
     report_id: UUID,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Deletes a report by ID.
     """
-    report = db.query(ReportModel).filter(ReportModel.id == report_id).first()
+    report = await db.get(ReportModel, report_id)
     if report is None:
         raise HTTPException(status_code=404, detail="Report not found")
     
-    db.delete(report)
-    db.commit()
+    await db.delete(report)
+    await db.commit()
     
     return {"status": "successfully deleted"} 
\ No newline at end of file
@@ -0,0 +1,15 @@
+from fastapi import APIRouter
+
+from ai.llm import embedding_cache, generation_cache
+
+router = APIRouter()
+
+@router.get("/stats")
+async def read_stats():
+    """
+    Gets runtime counters of the AI caches.
+    """
+    return {
+        "embedding_cache": embedding_cache.stats() if embedding_cache is not None else None,
+        "generation_cache": generation_cache.stats() if generation_cache is not None else None,
+    }
@@ -1,34 +1,42 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from typing import List, Optional
 from uuid import UUID
 
 from database import get_db
-from models import Tag, TagCreate, TagModel, QuestionModel, Question
+from pagination import paginate, page_items
+from models import Tag, TagCreate, TagModel, QuestionModel, QuestionTagModel, Question
 
 router = APIRouter()
 
 @router.get("/tags", response_model=List[Tag])
 async def read_tags(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
 ):
     """
-    Получает список всех тегов.
+    Получает список всех тегов, начиная с новых.
+    
+    Курсор следующей страницы возвращается в заголовке X-Next-Cursor.
     """
-    tags = db.query(TagModel).offset(skip).limit(limit).all()
+    result = await db.execute(paginate(select(TagModel), TagModel, limit, skip, cursor))
+    tags = page_items(result.scalars().all(), limit, response)
     return [Tag.from_orm(tag) for tag in tags]
 
 @router.get("/tags/{tag_id}", response_model=Tag)
 async def read_tag(
     tag_id: UUID,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Получает конкретный тег по ID.
     """
-    tag = db.query(TagModel).filter(TagModel.id == tag_id).first()
+    tag = await db.get(TagModel, tag_id)
     if tag is None:
         raise HTTPException(status_code=404, detail="Тег не найден")
     return Tag.from_orm(tag)
@@ -36,47 +44,51 @@ async def read_tag(
 @router.get("/tags/{tag_id}/questions", response_model=List[Question])
 async def read_tag_questions(
     tag_id: UUID,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
 ):
     """
-    Получает список вопросов по определенному тегу.
+    Получает список вопросов по определенному тегу, начиная с новых.
+    
+    Курсор следующей страницы возвращается в заголовке X-Next-Cursor.
     """
     # Проверяем существование тега
-    tag = db.query(TagModel).filter(TagModel.id == tag_id).first()
+    tag = await db.get(TagModel, tag_id)
     if tag is None:
         raise HTTPException(status_code=404, detail="Тег не найден")
     
     # Получаем список вопросов для тега
-    questions = (
-        db.query(QuestionModel)
-        .join(QuestionModel.tags)
-        .filter(TagModel.id == tag_id)
-        .offset(skip)
-        .limit(limit)
-        .all()
+    query = (
+        select(QuestionModel)
+        .options(selectinload(QuestionModel.tags))
+        .join(QuestionTagModel, QuestionTagModel.question_id == QuestionModel.id)
+        .where(QuestionTagModel.tag_id == tag_id)
     )
+    result = await db.execute(paginate(query, QuestionModel, limit, skip, cursor))
+    questions = page_items(result.scalars().all(), limit, response)
     
     return [Question.from_orm(question) for question in questions]
 
 @router.post("/tags", response_model=Tag, status_code=status.HTTP_201_CREATED)
 async def create_tag(
     tag: TagCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Создает новый тег.
     """
     # Проверяем, существует ли тег с таким именем
-    db_tag = db.query(TagModel).filter(TagModel.name == tag.name).first()
+    result = await db.execute(select(TagModel).where(TagModel.name == tag.name))
+    db_tag = result.scalars().first()
     if db_tag:
         raise HTTPException(status_code=400, detail="Тег с таким именем уже существует")
     
     # Создаем новый тег
     db_tag = TagModel(**tag.dict())
     db.add(db_tag)
-    db.commit()
-    db.refresh(db_tag)
+    await db.commit()
     
     return Tag.from_orm(db_tag) 
\ No newline at end of file
@@ -0,0 +1,80 @@
+import os
+import uuid
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import create_engine, event, text
+
+# Database tests run against a dedicated database initialised with database/init.sql
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+if TEST_DATABASE_URL:
+    os.environ["DATABASE_URL"] = TEST_DATABASE_URL
+
+TABLES = ["jobs", "reports", "answers", "interview_questions", "interviews", "question_tags", "tags", "questions"]
+
+@pytest.fixture
+def sync_db():
+    """Provide a synchronous connection to the test database for seeding data."""
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL is not set")
+    engine = create_engine(TEST_DATABASE_URL)
+    with engine.begin() as connection:
+        connection.execute(text(f"TRUNCATE {', '.join(TABLES)} CASCADE"))
+    yield engine
+    with engine.begin() as connection:
+        connection.execute(text(f"TRUNCATE {', '.join(TABLES)} CASCADE"))
+    engine.dispose()
+
+@pytest.fixture
+def db_client(sync_db):
+    """Provide a test client whose lifespan owns the async connection pool."""
+    from fastapi.testclient import TestClient
+    from main import app
+
+    with TestClient(app) as client:
+        yield client
+
+@pytest.fixture
+def count_queries():
+    """Count the SQL statements executed by the application engine inside a block."""
+    from database import engine
+
+    @contextmanager
+    def counter():
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            yield statements
+        finally:
+            event.remove(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+    return counter
+
+def seed_questions(engine, count: int, tags_per_question: int = 3):
+    """Insert questions with tags and return their IDs."""
+    tag_ids = [uuid.uuid4() for _ in range(tags_per_question)]
+    question_ids = [uuid.uuid4() for _ in range(count)]
+    with engine.begin() as connection:
+        connection.execute(
+            text("INSERT INTO tags (id, name) VALUES (:id, :name)"),
+            [{"id": tag_id, "name": f"tag-{i}"} for i, tag_id in enumerate(tag_ids)]
+        )
+        connection.execute(
+            text(
+                "INSERT INTO questions (id, text, difficulty_level, created_at) "
+                "VALUES (:id, :text, :difficulty, now() - make_interval(secs => :age))"
+            ),
+            [
+                {"id": question_id, "text": f"Question {i}", "difficulty": ["junior", "middle", "senior"][i % 3], "age": i}
+                for i, question_id in enumerate(question_ids)
+            ]
+        )
+        connection.execute(
+            text("INSERT INTO question_tags (question_id, tag_id) VALUES (:question_id, :tag_id)"),
+            [{"question_id": question_id, "tag_id": tag_id} for question_id in question_ids for tag_id in tag_ids]
+        )
+    return question_ids
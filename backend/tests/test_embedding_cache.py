@@ -0,0 +1,51 @@
+from ai.cache import EmbeddingCache, SemanticCache, embedding_cache_key
+
+def test_cache_key_ignores_whitespace_differences():
+    """Test that texts differing only in whitespace share a cache key."""
+    assert embedding_cache_key("model", 3, "What is  a\nclosure? ") == embedding_cache_key("model", 3, "What is a closure?")
+    assert embedding_cache_key("model", 3, "text") != embedding_cache_key("other-model", 3, "text")
+    assert embedding_cache_key("model", 3, "text") != embedding_cache_key("model", 4, "text")
+
+async def test_memory_cache_hits_and_eviction():
+    """Test LRU lookups, eviction and hit/miss counters of the in-memory layer."""
+    cache = EmbeddingCache(max_size=2)
+    assert await cache.get_many("model", 3, ["a"]) == [None]
+
+    await cache.set_many("model", 3, ["a", "b"], [[1.0], [2.0]])
+    assert await cache.get_many("model", 3, ["a"]) == [[1.0]]
+
+    # "b" is the least recently used entry and gets evicted
+    await cache.set_many("model", 3, ["c"], [[3.0]])
+    assert await cache.get_many("model", 3, ["a", "b", "c"]) == [[1.0], None, [3.0]]
+
+    stats = cache.stats()
+    assert stats["memory_hits"] == 3
+    assert stats["misses"] == 2
+    assert stats["size"] == 2
+
+def test_semantic_cache_returns_similar_entries():
+    """Test that lookups above the similarity threshold hit and the LRU entry is evicted."""
+    cache = SemanticCache(max_size=2, ttl_seconds=60, threshold=0.95)
+    assert cache.get([1.0, 0.0]) is None
+
+    cache.put([1.0, 0.0], "first")
+    cache.put([0.0, 1.0], "second")
+    assert cache.get([0.99, 0.05]) == "first"
+    assert cache.get([0.7, 0.7]) is None
+
+    # "second" is the least recently used entry and gets evicted
+    cache.put([-1.0, 0.0], "third")
+    assert cache.get([0.0, 1.0]) is None
+    assert cache.get([-1.0, 0.01]) == "third"
+
+    stats = cache.stats()
+    assert stats["hits"] == 2
+    assert stats["misses"] == 3
+    assert stats["evictions"] == 1
+
+def test_semantic_cache_expires_entries():
+    """Test that entries are not returned after their TTL."""
+    cache = SemanticCache(max_size=10, ttl_seconds=0, threshold=0.9)
+    cache.put([1.0, 0.0], "stale")
+    assert cache.get([1.0, 0.0]) is None
+    assert cache.stats()["expirations"] == 1
@@ -0,0 +1,38 @@
+import asyncio
+
+import ai.llm as llm
+
+QUESTIONS = [
+    {"id": f"q{i}", "text": f"Question {i}", "difficulty_level": "middle", "tags": ["python"]}
+    for i in range(6)
+]
+ANSWERS = [{"question_id": f"q{i}", "user_answer": f"Answer {i}"} for i in range(6)]
+
+async def test_parallel_evaluation_is_bounded_and_keyed_by_question(monkeypatch):
+    """Test per-answer calls respect the concurrency limit and a failed call shifts no results."""
+    monkeypatch.setattr(llm.settings, "EVALUATION_CONCURRENCY", 2)
+    running = 0
+    peak = 0
+
+    async def fake_evaluate_answer(qa):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        if qa["question_id"] == "q3":
+            raise RuntimeError("model skipped this answer")
+        return {"correctness": "correct", "comment": qa["answer"], "correct_answer": qa["question"]}
+
+    async def fake_summarize(qa_pairs, question_evaluations):
+        return {"feedback": "ok", "assessment": "ok", "achieved_level": "middle", "score": 80}
+
+    monkeypatch.setattr(llm, "evaluate_answer", fake_evaluate_answer)
+    monkeypatch.setattr(llm, "summarize_evaluations", fake_summarize)
+
+    evaluation = await llm.evaluate_answers_parallel(QUESTIONS, ANSWERS)
+
+    assert peak == 2
+    assert evaluation["score"] == 80
+    assert set(evaluation["question_evaluations"]) == {"q0", "q1", "q2", "q4", "q5"}
+    assert evaluation["question_evaluations"]["q4"]["comment"] == "Answer 4"
@@ -0,0 +1,59 @@
+import time
+
+from fastapi import HTTPException
+
+def wait_for_job(client, job_id, timeout=10):
+    """Poll a job until it has finished."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = client.get(f"/api/jobs/{job_id}").json()
+        if job["status"] in ("completed", "failed"):
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"Job {job_id} did not finish")
+
+def test_background_generation_job(sync_db, db_client, monkeypatch):
+    """Test that a background request returns 202 and the worker stores the result."""
+    import routes.questions
+    from models import QuestionGenerateResponse
+
+    async def fake_generate(request, db):
+        return QuestionGenerateResponse(questions=[])
+
+    monkeypatch.setattr(routes.questions, "generate_questions_from_prompt", fake_generate)
+
+    response = db_client.post("/api/questions/generate", params={"background": "true"}, json={"prompt": "python"})
+
+    assert response.status_code == 202
+    job = response.json()
+    assert job["status"] == "pending"
+    assert response.headers["Location"] == f"/api/jobs/{job['id']}"
+
+    job = wait_for_job(db_client, job["id"])
+    assert job["status"] == "completed"
+    assert job["result"] == {"questions": []}
+    assert job["attempts"] == 1
+
+def test_background_job_failure(sync_db, db_client, monkeypatch):
+    """Test that handler errors are stored on the job and the events stream ends with them."""
+    import routes.interviews
+
+    async def fake_generate(request, db):
+        raise HTTPException(status_code=404, detail="No questions found matching the request")
+
+    monkeypatch.setattr(routes.interviews, "generate_interview_from_prompt", fake_generate)
+
+    response = db_client.post("/api/interviews/generate", params={"background": "true"}, json={"prompt": "python"})
+    assert response.status_code == 202
+
+    with db_client.stream("GET", f"/api/jobs/{response.json()['id']}/events") as events:
+        lines = [line for line in events.iter_lines() if line.startswith("event:")]
+
+    assert lines[-1] == "event: failed"
+    job = wait_for_job(db_client, response.json()["id"])
+    assert job["error"] == "No questions found matching the request"
+
+def test_read_unknown_job(sync_db, db_client):
+    """Test that an unknown job ID returns 404."""
+    response = db_client.get("/api/jobs/00000000-0000-0000-0000-000000000000")
+    assert response.status_code == 404
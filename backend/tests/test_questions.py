@@ -0,0 +1,52 @@
+from tests.conftest import seed_questions
+
+def test_read_questions_query_count_is_constant(sync_db, db_client, count_queries):
+    """Test that listing questions with tags does not issue a query per question."""
+    question_ids = seed_questions(sync_db, 100)
+
+    with count_queries() as statements:
+        response = db_client.get("/api/questions", params={"limit": 100})
+
+    assert response.status_code == 200
+    questions = response.json()
+    assert [q["id"] for q in questions] == [str(question_id) for question_id in question_ids]
+    assert all(len(q["tags"]) == 3 for q in questions)
+    # One query for the page and one for the tags
+    assert len(statements) <= 2
+
+def test_read_questions_filters(sync_db, db_client, count_queries):
+    """Test the tag and difficulty filters keep the created_at ordering."""
+    question_ids = seed_questions(sync_db, 30)
+
+    with count_queries() as statements:
+        response = db_client.get("/api/questions", params={"tag": "tag-1", "difficulty": "middle", "limit": 5})
+
+    assert response.status_code == 200
+    assert [q["id"] for q in response.json()] == [str(question_id) for question_id in question_ids[1::3][:5]]
+    assert len(statements) <= 2
+
+def test_read_questions_cursor_pagination(sync_db, db_client):
+    """Test that following X-Next-Cursor walks every question exactly once."""
+    question_ids = seed_questions(sync_db, 25, tags_per_question=1)
+
+    seen = []
+    params = {"limit": 10}
+    while True:
+        response = db_client.get("/api/questions", params=params)
+        assert response.status_code == 200
+        seen.extend(q["id"] for q in response.json())
+        next_cursor = response.headers.get("X-Next-Cursor")
+        if not next_cursor:
+            break
+        params = {"limit": 10, "cursor": next_cursor}
+
+    assert seen == [str(question_id) for question_id in question_ids]
+
+    # Offset pagination keeps working
+    response = db_client.get("/api/questions", params={"skip": 20, "limit": 10})
+    assert [q["id"] for q in response.json()] == seen[20:]
+
+def test_read_questions_invalid_cursor(sync_db, db_client):
+    """Test that a malformed cursor is rejected."""
+    response = db_client.get("/api/questions", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
@@ -0,0 +1,43 @@
+import asyncio
+import logging
+
+from config import settings
+from database import AsyncSessionLocal, engine
+from jobs import JobWorker
+# Importing the routers registers their job handlers
+from routes import questions, interviews
+
+# Configure logging
+logging.basicConfig(
+    level=logging.DEBUG if settings.DEBUG else logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+async def main():
+    """
+    Runs the background job worker without the API.
+    
+    Start the API with JOB_WORKER_ENABLED=false to run jobs only in worker processes.
+    """
+    worker = JobWorker(
+        AsyncSessionLocal,
+        settings.JOB_WORKER_CONCURRENCY,
+        settings.JOB_POLL_INTERVAL,
+        settings.JOB_TIMEOUT,
+        settings.JOB_MAX_ATTEMPTS
+    )
+    await worker.start()
+    try:
+        # Run until the process is stopped
+        await asyncio.Event().wait()
+    finally:
+        await worker.stop()
+        await engine.dispose()
+
+if __name__ == "__main__":
+    logger.info("Starting Interviewer job worker")
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
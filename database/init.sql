@@ -13,14 +13,16 @@ CREATE TABLE IF NOT EXISTS questions (
     text TEXT NOT NULL,
     difficulty_level difficulty_level NOT NULL,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
-    vector_embedding vector(3072)
+    -- halfvec вместо vector: индекс HNSW поддерживает до 4000 измерений
+    vector_embedding halfvec(3072)
 );
 
 -- Таблица тегов
 CREATE TABLE IF NOT EXISTS tags (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
     name VARCHAR(255) NOT NULL UNIQUE,
-    description TEXT
+    description TEXT,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
 );
 
 -- Таблица связи вопросов с тегами
@@ -69,8 +71,44 @@ CREATE TABLE IF NOT EXISTS reports (
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Кэш эмбеддингов (ключ: sha256 от модели, размерности и нормализованного текста)
+CREATE TABLE IF NOT EXISTS embedding_cache (
+    key VARCHAR(64) PRIMARY KEY,
+    model VARCHAR(255) NOT NULL,
+    dimension INTEGER NOT NULL,
+    embedding vector NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Фоновые задачи (генерация и оценка через LLM)
+CREATE TABLE IF NOT EXISTS jobs (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    kind VARCHAR(50) NOT NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'pending',
+    payload JSONB NOT NULL,
+    result JSONB,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    started_at TIMESTAMP WITH TIME ZONE,
+    finished_at TIMESTAMP WITH TIME ZONE
+);
+
 -- Индексы для оптимизации запросов
 CREATE INDEX idx_questions_difficulty ON questions(difficulty_level);
 CREATE INDEX idx_interviews_difficulty ON interviews(difficulty_level);
 CREATE INDEX idx_answers_interview ON answers(interview_id);
-CREATE INDEX idx_reports_interview ON reports(interview_id); 
\ No newline at end of file
+CREATE INDEX idx_reports_interview ON reports(interview_id);
+
+-- Индексы для курсорной пагинации по (created_at, id)
+CREATE INDEX idx_questions_created_id ON questions(created_at, id);
+CREATE INDEX idx_tags_created_id ON tags(created_at, id);
+CREATE INDEX idx_interviews_created_id ON interviews(created_at, id);
+CREATE INDEX idx_reports_created_id ON reports(created_at, id);
+CREATE INDEX idx_question_tags_tag ON question_tags(tag_id, question_id);
+
+-- Очередь задач: выборка самой старой задачи по статусу
+CREATE INDEX idx_jobs_status_created ON jobs(status, created_at);
+
+-- ANN-индекс для семантического поиска вопросов
+CREATE INDEX idx_questions_embedding_hnsw ON questions USING hnsw (vector_embedding halfvec_cosine_ops) WITH (m = 16, ef_construction = 64);